@@ -1,27 +1,276 @@
 
 
 import argparse
+import concurrent.futures
 import subprocess
 import time
 import pathlib
 import sys
 import os
+import shutil
+import tempfile
 
-def run(cmd, **kwargs):
+# resolved once here so no call walks PATH again
+GIT = shutil.which("git") or "git"
+
+# every git call skips the auto-gc probe and reads the index with preloading
+GIT_CMD = [GIT, "-c", "gc.auto=0", "-c", "core.preloadIndex=true"]
+
+# resolved once by is_git_repo(); _HEAD_SHA then follows our own commits
+_REPO_ROOT = None
+_HEAD_SHA = None
+
+# chunk size for raw file reads and writes; 128 KiB beats the 8 KiB io default
+BUF = 1 << 17
+
+def subcommand(cmd) -> str:
+    # the git verb in an argv, for error messages; skips any per-call -c options
+    i = len(GIT_CMD)
+    while cmd[i] == "-c":
+        i += 2
+    return cmd[i]
+
+def run_capture(cmd, **kwargs):
     return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
 
+def run_checked(cmd, **kwargs):
+    # stdout is thrown away and stderr is only decoded when we have to report it
+    r = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **kwargs)
+    if r.returncode != 0:
+        raise RuntimeError(f"git {subcommand(cmd)} failed: {r.stderr.decode('utf-8', 'replace').strip()}")
+
 def is_git_repo():
-    r = run(["git", "rev-parse", "--is-inside-work-tree"])
-    return r.returncode == 0 and r.stdout.strip() == "true"
+    global _REPO_ROOT, _HEAD_SHA
+    # one rev-parse answers all three; HEAD is missing on an unborn branch
+    r = run_capture([*GIT_CMD, "rev-parse", "--is-inside-work-tree", "--show-toplevel", "--verify", "-q", "HEAD"])
+    lines = r.stdout.splitlines()
+    if not lines or lines[0] != "true":
+        return False
+    _REPO_ROOT = lines[1]
+    _HEAD_SHA = lines[2] if len(lines) > 2 else None
+    return True
+
+def track_file(file_path: str, env=None):
+    # intent-to-add once so `git commit --only` accepts a path git hasn't seen yet
+    run_checked([*GIT_CMD, "add", "--intent-to-add", "--", file_path], env=env)
+
+def commit_argv(file_path: str, message: str):
+    # --only stages and commits the path in one process instead of add + commit and
+    # limits commit's status scan to that path; hooks and signing are skipped
+    return [*GIT_CMD, "-c", "core.untrackedCache=true", "commit", "--no-verify", "--no-gpg-sign", "-q",
+            "-m", message, "--only", "--", file_path]
 
 def git_commit(file_path: str, message: str, env=None):
-    a = run(["git", "add", file_path], env=env)
-    if a.returncode != 0:
-        raise RuntimeError(f"git add failed: {a.stderr.strip()}")
-    c = run(["git", "commit", "-m", message], env=env)
-    if c.returncode != 0:
-        raise RuntimeError(f"git commit failed: {c.stderr.strip()}")
-    return c.stdout.strip()
+    run_checked(commit_argv(file_path, message), env=env)
+
+def repo_path(file_path: str) -> str:
+    # path of file_path relative to the top level, as git spells it in trees
+    full = os.path.join(os.path.realpath(os.path.dirname(os.path.abspath(file_path))), os.path.basename(file_path))
+    return os.path.relpath(full, _REPO_ROOT).replace(os.sep, "/")
+
+def git_output(cmd, env=None) -> str:
+    r = run_capture(cmd, env=env)
+    if r.returncode != 0:
+        raise RuntimeError(f"git {subcommand(cmd)} failed: {r.stderr.strip()}")
+    return r.stdout.strip()
+
+def restamp_ident(ident: str) -> str:
+    # `git var` idents end in "<epoch> <tz>"; swap in the current time
+    who = ident.rsplit(" ", 2)[0]
+    off = time.localtime().tm_gmtoff // 60
+    sign = "-" if off < 0 else "+"
+    return f"{who} {int(time.time())} {sign}{abs(off) // 60:02d}{abs(off) % 60:02d}"
+
+REFLOG_MSG = "commiter: toggle"
+ADD_MSG = "cleanup"
+REMOVE_MSG = "backup page"
+
+def load_idents(env=None):
+    # `git var` applies the GIT_AUTHOR_*/GIT_COMMITTER_* overrides in env for us;
+    # an explicit *_DATE pins that ident's timestamp
+    src = os.environ if env is None else env
+    return [(git_output([*GIT_CMD, "var", f"GIT_{who}_IDENT"], env=env), f"GIT_{who}_DATE" in src)
+            for who in ("AUTHOR", "COMMITTER")]
+
+def stamp_idents(idents):
+    return [ident if fixed else restamp_ident(ident) for ident, fixed in idents]
+
+class PorcelainCommitter:
+    def __init__(self, file_path: str, env=None):
+        self.file_path = file_path
+        self.env = env
+        # the loop only ever uses two messages, so build each argv once
+        self.argvs = {m: commit_argv(file_path, m) for m in (ADD_MSG, REMOVE_MSG)}
+        track_file(file_path, env=env)
+
+    def commit(self, message: str, data=None):
+        argv = self.argvs.get(message)
+        if argv is None:
+            git_commit(self.file_path, message, env=self.env)
+        else:
+            run_checked(argv, env=self.env)
+
+    def close(self):
+        pass
+
+class PlumbingCommitter:
+    # Talks to long-lived `git hash-object --stdin-paths` and `git update-ref --stdin`
+    # processes so a steady-state commit spawns no git process at all. The file only
+    # ever alternates between two contents, so the tree for each blob is built once
+    # in a scratch index and reused. With batch=True the chain is built entirely
+    # in the object store and HEAD moves once, on close().
+
+    def __init__(self, file_path: str, env=None, batch: bool = False):
+        self.file_path = file_path
+        self.env = env
+        self.published = _HEAD_SHA
+        self.tree_path = repo_path(file_path)
+        self.idents = load_idents(env)
+        self.trees = {}
+
+        self.tmpdir = tempfile.TemporaryDirectory(prefix="commiter-")
+        self.commit_file = os.path.join(self.tmpdir.name, "commit")
+        self.index_env = (os.environ if env is None else env).copy()
+        self.index_env["GIT_INDEX_FILE"] = os.path.join(self.tmpdir.name, "index")
+        if _HEAD_SHA:
+            run_checked([*GIT_CMD, "read-tree", _HEAD_SHA], env=self.index_env)
+
+        pipes = dict(stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        self.blobs = subprocess.Popen([*GIT_CMD, "hash-object", "-w", "--stdin-paths"], **pipes)
+        self.commits = subprocess.Popen([*GIT_CMD, "hash-object", "-w", "-t", "commit", "--no-filters", "--stdin-paths"], **pipes)
+        self.refs = None
+        if not batch:
+            self.refs = subprocess.Popen([*GIT_CMD, "update-ref", "-m", REFLOG_MSG, "--stdin"], **pipes)
+
+    def _ask(self, proc, request: str, replies: int = 1):
+        proc.stdin.write(request.encode("utf-8"))
+        proc.stdin.flush()
+        out = [proc.stdout.readline().decode("utf-8").strip() for _ in range(replies)]
+        if not all(out):
+            proc.wait()
+            err = proc.stderr.read().decode("utf-8", "replace").strip()
+            raise RuntimeError(f"git {subcommand(proc.args)} failed: {err}")
+        return out[-1]
+
+    def _tree_for(self, blob: str) -> str:
+        tree = self.trees.get(blob)
+        if tree is None:
+            mode = "100755" if os.stat(self.file_path).st_mode & 0o111 else "100644"
+            run_checked([*GIT_CMD, "update-index", "--add", "--cacheinfo", f"{mode},{blob},{self.tree_path}"], env=self.index_env)
+            tree = self.trees[blob] = git_output([*GIT_CMD, "write-tree"], env=self.index_env)
+        return tree
+
+    def commit(self, message: str, data=None):
+        global _HEAD_SHA
+        # hash-object runs from the top level, so it wants the tree path
+        blob = self._ask(self.blobs, self.tree_path + "\n")
+        tree = self._tree_for(blob)
+        author, committer = stamp_idents(self.idents)
+        body = f"tree {tree}\n"
+        if _HEAD_SHA:
+            body += f"parent {_HEAD_SHA}\n"
+        body += f"author {author}\ncommitter {committer}\n\n{message}\n"
+        with open(self.commit_file, "w", encoding="utf-8", newline="\n") as fh:
+            fh.write(body)
+        _HEAD_SHA = self._ask(self.commits, self.commit_file + "\n")
+        if self.refs:
+            self._publish()
+        return _HEAD_SHA
+
+    def _publish(self):
+        # compare-and-swap against what we last published so a concurrent commit isn't lost
+        old = [self.published] if self.published else []
+        if self.refs:
+            self._ask(self.refs, f"start\nupdate HEAD {' '.join([_HEAD_SHA, *old])}\ncommit\n", replies=2)
+        else:
+            run_checked([*GIT_CMD, "update-ref", "-m", REFLOG_MSG, "HEAD", _HEAD_SHA, *old], env=self.env)
+        self.published = _HEAD_SHA
+
+    def close(self):
+        try:
+            # a failed compare-and-swap already reported itself and took update-ref down with it
+            if _HEAD_SHA != self.published and (self.refs is None or self.refs.poll() is None):
+                self._publish()
+        finally:
+            for proc in (self.blobs, self.commits, self.refs):
+                if proc is None:
+                    continue
+                if proc.poll() is None:
+                    proc.stdin.close()
+                proc.wait()
+            self.tmpdir.cleanup()
+        # bring the real index in line with the commits we wrote behind its back
+        try:
+            run_checked([*GIT_CMD, "update-index", "--add", "--", self.file_path], env=self.env)
+        except RuntimeError as e:
+            print(f"Warning: could not refresh the index: {e}", file=sys.stderr)
+
+class FastImportCommitter:
+    # Streams every commit into a single `git fast-import` process: one git process
+    # for the whole run. fast-import only moves the branch when it exits, so HEAD
+    # catches up in close(). Content is the file's raw bytes: fast-import applies no
+    # clean filter or line-ending conversion, so paths that would get one are refused.
+
+    def __init__(self, file_path: str, env=None):
+        self.file_path = file_path
+        self.env = env
+        self.tree_path = repo_path(file_path)
+        self.idents = load_idents(env)
+        r = run_capture([*GIT_CMD, "symbolic-ref", "-q", "HEAD"], env=env)
+        if r.returncode != 0:
+            raise RuntimeError("the fast-import backend needs a branch checked out (HEAD is detached)")
+        self.ref = r.stdout.strip()
+        self.refuse_conversions()
+        self.first = True
+        # the file alternates between two contents; send each blob once and refer to it by mark
+        self.marks = {}
+        self.proc = subprocess.Popen([*GIT_CMD, "fast-import", "--quiet", "--date-format=raw"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+
+    def refuse_conversions(self):
+        # `git add` would store a converted blob and leave the index out of step with our commits
+        out = git_output([*GIT_CMD, "check-attr", "-z", "text", "eol", "filter", "--", self.file_path], env=self.env)
+        fields = out.split("\0")
+        for attr, value in zip(fields[1::3], fields[2::3]):
+            if value not in ("unspecified", "unset"):
+                raise RuntimeError(f"the fast-import backend can't honour {attr}={value} on {self.file_path}; "
+                                   "use --backend plumbing")
+        r = run_capture([*GIT_CMD, "config", "--get", "core.autocrlf"], env=self.env)
+        if r.stdout.strip() not in ("", "false"):
+            raise RuntimeError(f"the fast-import backend can't honour core.autocrlf={r.stdout.strip()}; "
+                               "use --backend plumbing")
+
+    def commit(self, message: str, data=None):
+        # always what's on disk, so HEAD, the index and the work tree agree
+        data = read_file_bytes(pathlib.Path(self.file_path))
+        out = self.proc.stdin
+        mark = self.marks.get(data)
+        if mark is None:
+            mark = self.marks[data] = len(self.marks) + 1
+            out.write(b"blob\nmark :%d\ndata %d\n%s\n" % (mark, len(data), data))
+        author, committer = stamp_idents(self.idents)
+        msg = (message + "\n").encode("utf-8")
+        header = f"commit {self.ref}\nauthor {author}\ncommitter {committer}\n"
+        out.write(header.encode("utf-8") + b"data %d\n%s" % (len(msg), msg))
+        if self.first and _HEAD_SHA:
+            # continue from the existing tip; later commits chain onto the branch by themselves
+            out.write(f"from {_HEAD_SHA}\n".encode("ascii"))
+        self.first = False
+        mode = "100755" if os.stat(self.file_path).st_mode & 0o111 else "100644"
+        out.write(f"M {mode} :{mark} {self.tree_path}\n\n".encode("utf-8"))
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        if self.proc.wait() != 0:
+            err = self.proc.stderr.read().decode("utf-8", "replace").strip()
+            raise RuntimeError(f"git fast-import failed: {err}")
+        try:
+            run_checked([*GIT_CMD, "update-index", "--add", "--", self.file_path], env=self.env)
+        except RuntimeError as e:
+            print(f"Warning: could not refresh the index: {e}", file=sys.stderr)
 
 def ensure_file(path: pathlib.Path):
     if not path.exists():
@@ -34,18 +283,122 @@ def normalize_line(s: str) -> str:
         return s[1:-1]
     return s
 
-def read_file_text(path: pathlib.Path) -> str:
-    # Use utf-8 and be resilient to bad bytes by replacing them
+def contains_line(data: bytes, line: bytes) -> bool:
+    # substring scans run in C; no list of lines is built
+    padded = b"\n" + data
+    if b"\n" + line + b"\n" in padded or b"\n" + line + b"\r\n" in padded:
+        return True
+    # a last line without its newline; an empty one there is no line at all
+    return bool(line) and padded.endswith(b"\n" + line)
+
+def remove_line(data: bytes, line: bytes) -> bytes:
+    # drop every exact copy of `line`, leaving every other byte as it was
+    padded = b"\n" + data
+    for end in (b"\r\n", b"\n"):
+        hit = b"\n" + line + end
+        # back-to-back copies overlap on their shared "\n", so repeat until gone
+        while hit in padded:
+            padded = padded.replace(hit, b"\n")
+    if line and padded.endswith(b"\n" + line):
+        padded = padded[:-len(line)]
+    return padded[1:]
+
+def read_file_bytes(path: pathlib.Path) -> bytes:
+    # raw fd reads in BUF-sized chunks; no BufferedReader with its 8 KiB default
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        chunks = []
+        while chunk := os.read(fd, BUF):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+def read_file_or_reset(path: pathlib.Path) -> bytes:
+    # the raw bytes, undecoded, so the buffer we edit and commit is exactly what's on disk
     try:
-        return path.read_text(encoding="utf-8", errors="replace")
+        return read_file_bytes(path)
     except Exception as e:
-        # fallback: create empty file and return empty string
+        # fallback: create empty file and return no content
         print(f"Warning: could not read {path} cleanly: {e}. Recreating/emptying file.")
         path.write_text("", encoding="utf-8")
-        return ""
+        return b""
 
-def write_file_text(path: pathlib.Path, txt: str):
-    path.write_text(txt, encoding="utf-8", errors="replace")
+def write_all(fd: int, data: bytes):
+    # hand the kernel up to BUF bytes per write, the same granularity as reads
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view[:BUF]):]
+
+def write_file_bytes(path: pathlib.Path, data, flags: int = os.O_TRUNC):
+    # raw fd write: no buffered/text IO layers between us and the syscall
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0) | flags, 0o644)
+    try:
+        write_all(fd, data)
+    finally:
+        os.close(fd)
+
+def append_file_bytes(path: pathlib.Path, data):
+    # O_APPEND writes only the new bytes instead of rewriting the whole file
+    write_file_bytes(path, data, flags=os.O_APPEND)
+
+def run_parallel(args, file_path: pathlib.Path, env=None):
+    # one branch + worktree per worker; each worker is a child run of this script,
+    # so worktrees never share an index and the children share no state. Each worker
+    # toggles its own copy of the file (toggle.txt -> toggle.<w>.txt): identical
+    # content, messages and timestamps would otherwise hash to identical commits,
+    # and separate files keep the branches from conflicting when merged
+    k = args.parallel
+    stamp = f"{int(time.time())}-{os.getpid()}"
+    branches = [f"commiter/{stamp}-{w}" for w in range(k)]
+    root = tempfile.mkdtemp(prefix="commiter-wt-")
+    trees = []
+    done = False
+    try:
+        for w, branch in enumerate(branches):
+            tree = os.path.join(root, str(w))
+            run_checked([*GIT_CMD, "worktree", "add", "-q", "-b", branch, tree, "HEAD"], env=env)
+            trees.append(tree)
+
+        rel = pathlib.PurePosixPath(repo_path(str(file_path)))
+        # --opt=value so a line or path starting with "-" isn't taken for an option
+        argv = [sys.executable, os.path.abspath(__file__), f"--line={args.line}",
+                "--sleep", str(args.sleep), "--backend", args.backend]
+        if args.batch:
+            argv.append("--batch")
+        if args.quiet:
+            argv.append("--quiet")
+
+        def work(w):
+            n = args.iters // k + (1 if w < args.iters % k else 0)
+            own = rel.with_name(f"{rel.stem}.{w}{rel.suffix}")
+            return subprocess.run([*argv, f"--file={own}", "--iters", str(n)], cwd=trees[w], env=env).returncode
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=k) as pool:
+            failed = [b for b, rc in zip(branches, pool.map(work, range(k))) if rc != 0]
+        if failed:
+            raise RuntimeError(f"workers failed on {', '.join(failed)}")
+
+        made = int(git_output([*GIT_CMD, "rev-list", "--count", *branches, "--not", "HEAD"], env=env))
+        if made != args.iters:
+            raise RuntimeError(f"expected {args.iters} distinct commits across the branches, found {made}")
+        done = True
+    finally:
+        for tree in trees:
+            run_capture([*GIT_CMD, "worktree", "remove", "--force", tree], env=env)
+        shutil.rmtree(root, ignore_errors=True)
+        if not done:
+            # a worktree that was added has its branch; don't leave half-made branches behind
+            for branch in branches[:len(trees)]:
+                run_capture([*GIT_CMD, "branch", "-D", "-q", branch], env=env)
+
+    if args.merge:
+        m = run_capture([*GIT_CMD, "merge", "--no-ff", "-q", "-m", f"Merge {k} parallel toggle branches", *branches], env=env)
+        if m.returncode != 0:
+            # e.g. an untracked file in the way of a worker's copy
+            run_capture([*GIT_CMD, "merge", "--abort"], env=env)
+            raise RuntimeError(f"octopus merge failed, branches left unmerged: {m.stderr.strip() or m.stdout.strip()}")
+    print(f"\nBranches: {' '.join(branches)}")
 
 def main():
     p = argparse.ArgumentParser(description="Auto toggle line and commit repeatedly (for testing).")
@@ -55,10 +408,23 @@ def main():
     p.add_argument("--sleep", "-s", type=float, default=1.0, help="Seconds to sleep between commits")
     p.add_argument("--author-name", help="Optional: set GIT_AUTHOR_NAME for commits")
     p.add_argument("--author-email", help="Optional: set GIT_AUTHOR_EMAIL for commits")
+    p.add_argument("--backend", choices=("plumbing", "porcelain", "fast-import"), default="plumbing",
+                   help="plumbing: persistent git pipes, no hooks; porcelain: one `git commit` per iteration; "
+                        "fast-import: one git process for the whole run, HEAD moves when it ends")
+    p.add_argument("--batch", action="store_true",
+                   help="plumbing only: build the whole commit chain and move HEAD once at the end")
+    p.add_argument("--parallel", "-j", type=int, default=1,
+                   help="Split the iterations across this many worktrees/branches committing concurrently; "
+                        "worker w toggles its own copy of the file, e.g. toggle.w.txt")
+    p.add_argument("--merge", action="store_true", help="With --parallel: octopus-merge the branches into HEAD")
+    p.add_argument("--quiet", "-q", action="store_true", help="Don't print a line per iteration")
     args = p.parse_args()
+    if args.merge and args.parallel < 2:
+        p.error("--merge only applies with --parallel 2 or more")
+    if args.batch and args.backend != "plumbing":
+        p.error("--batch only applies to --backend plumbing")
 
     file_path = pathlib.Path(args.file)
-    ensure_file(file_path)
 
     if not is_git_repo():
         print("Error: current directory is not a git repo. Initialize one with `git init` and try again.", file=sys.stderr)
@@ -68,7 +434,7 @@ def main():
     target_line = normalize_line(args.line)
     env = None
     if args.author_name or args.author_email:
-        env = dict(**os.environ)
+        env = os.environ.copy()
         if args.author_name:
             env["GIT_AUTHOR_NAME"] = args.author_name
             env["GIT_COMMITTER_NAME"] = args.author_name
@@ -76,45 +442,101 @@ def main():
             env["GIT_AUTHOR_EMAIL"] = args.author_email
             env["GIT_COMMITTER_EMAIL"] = args.author_email
 
-    print(f"Target file: {file_path}")
-    print(f"Line to toggle: {target_line!r}")
-    print(f"Iterations: {args.iters}, Sleep: {args.sleep}s")
-    print("Commits will be labeled with 'test/auto' so they are clearly for testing.\n")
+    if args.parallel > 1:
+        try:
+            run_parallel(args, file_path, env=env)
+        except Exception as e:
+            print("Error:", e, file=sys.stderr)
+            sys.exit(1)
+        return
+
+    # parallel runs create the file in their own worktrees, not this one
+    ensure_file(file_path)
 
-    for i in range(1, args.iters + 1):
-        text = read_file_text(file_path)
-        lines = text.splitlines()
-        has_line = any(line == target_line for line in lines)
+    try:
+        if args.backend == "plumbing":
+            committer = PlumbingCommitter(str(file_path), env=env, batch=args.batch)
+        elif args.backend == "fast-import":
+            committer = FastImportCommitter(str(file_path), env=env)
+        else:
+            committer = PorcelainCommitter(str(file_path), env=env)
+    except Exception as e:
+        print("Error:", e, file=sys.stderr)
+        sys.exit(1)
 
-        try:
-            if not has_line:
-                # add the line at the end with newline if necessary
-                if text and not text.endswith("\n"):
-                    text += "\n"
-                text += target_line + "\n"
-                write_file_text(file_path, text)
-                msg = f"cleanup"
-                print(f"[{i}] Adding line -> committing: {msg}")
+    # one write for the whole banner rather than a print (and possible flush) per line
+    sys.stdout.write("\n".join([
+        f"Target file: {file_path}",
+        f"Line to toggle: {target_line!r}",
+        f"Iterations: {args.iters}, Sleep: {args.sleep}s",
+        "Commits will be labeled with 'test/auto' so they are clearly for testing.\n\n",
+    ]))
+
+    # read once; after that the loop edits this buffer in place and knows
+    # exactly what it last wrote. An empty file (the usual case on a first run)
+    # needs no open/read at all; any other size has to be read, since equal
+    # length doesn't mean equal bytes
+    buf = bytearray(read_file_or_reset(file_path) if file_path.stat().st_size else b"")
+    # surrogateescape gives back the exact bytes of a non-UTF-8 --line argument
+    line = target_line.encode("utf-8", "surrogateescape")
+    has_line = contains_line(buf, line)
+    needle = line + b"\n"
+    line_offset = None
+
+    def toggle(i):
+        nonlocal has_line, buf, line_offset
+        if not has_line:
+            # add the line at the end with newline if necessary
+            tail = b"\n" + needle if buf and not buf.endswith(b"\n") else needle
+            buf += tail
+            line_offset = len(buf) - len(needle)
+            append_file_bytes(file_path, tail)
+            msg = ADD_MSG
+            if not args.quiet:
+                sys.stdout.write(f"[{i}] Adding line -> committing: {msg}\n")
+        else:
+            if line_offset is not None:
+                # the only copy is the one we put at the end
+                del buf[line_offset:]
+                line_offset = None
             else:
                 # remove all exact-match lines
-                new_lines = [ln for ln in lines if ln != target_line]
-                out = "\n".join(new_lines)
-                if new_lines:
-                    out += "\n"
-                write_file_text(file_path, out)
-                msg = f"backup page"
-                print(f"[{i}] Removing line -> committing: {msg}")
-
-            git_commit(str(file_path), msg, env=env)
-        except subprocess.CalledProcessError as e:
-            print("Git command failed:", e, file=sys.stderr)
-            sys.exit(1)
+                buf = bytearray(remove_line(buf, line))
+            write_file_bytes(file_path, buf)
+            msg = REMOVE_MSG
+            if not args.quiet:
+                sys.stdout.write(f"[{i}] Removing line -> committing: {msg}\n")
+
+        committer.commit(msg, buf)
+        has_line = not has_line
+
+    # with a sleep, each iteration's write+commit runs on a worker while the main
+    # thread sleeps, so commits start every max(sleep, commit time) seconds
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        for i in range(1, args.iters + 1):
+            try:
+                # nothing to wait for after the last commit
+                if args.sleep > 0 and i < args.iters:
+                    pending = pool.submit(toggle, i)
+                    time.sleep(args.sleep)
+                    pending.result()
+                else:
+                    toggle(i)
+            except subprocess.CalledProcessError as e:
+                print("Git command failed:", e, file=sys.stderr)
+                sys.exit(1)
+            except Exception as e:
+                print("Error:", e, file=sys.stderr)
+                sys.exit(1)
+    finally:
+        pool.shutdown()
+        try:
+            committer.close()
         except Exception as e:
             print("Error:", e, file=sys.stderr)
             sys.exit(1)
 
-        time.sleep(args.sleep)
-
     print("\nDone. Inspect the history with `git log --oneline --decorate --graph`")
 
 if __name__ == "__main__":
@@ -1,20 +1,12 @@
 import sys
 
 from PyQt6.QtWidgets import (
-    QMainWindow, QStackedWidget
-)
-from PyQt6.QtWidgets import (
-    QApplication
+    QApplication, QMainWindow, QStackedWidget
 )
+from PyQt6.QtGui import QPixmapCache
 
 from core.config import ConfigManager
 from core.const import stylesheet
-from core.dashboard import DashboardPage
-from core.auth import AuthPage
-from pushbox.core.files.backup import BackupPage
-from pushbox.core.files.restore import RestorePage
-from core.settings import SettingsPage
-from core.onboarding import OnboardingPage
 
 
 
@@ -25,46 +17,81 @@ class MainWindow(QMainWindow):
 
         self.config_manager = ConfigManager()
 
-        self.onboarding_page = OnboardingPage(self.show_auth, self.config_manager)
-        self.auth_page = AuthPage(self.show_dashboard, self.config_manager)
-        self.backup_page = BackupPage(self.config_manager)
-        self.restore_page = RestorePage()
-        self.settings_page = SettingsPage(self.config_manager)
-        self.dashboard_page = DashboardPage(self.config_manager)
+        # pages are built on first navigation; startup only pays for the one shown
+        self._page_factories = {
+            "onboarding": self._make_onboarding,
+            "auth": self._make_auth,
+            "dashboard": self._make_dashboard,
+            "backup": self._make_backup,
+            "restore": self._make_restore,
+            "settings": self._make_settings,
+        }
+        self._pages = {}
 
         self.mainStack = QStackedWidget()
         self.setCentralWidget(self.mainStack)
 
-        self.mainStack.addWidget(self.onboarding_page)
-        self.mainStack.addWidget(self.auth_page)
-
-        self.mainStack.addWidget(self.dashboard_page)
-
         cfg = self.config_manager.load_config()
         onboarding_done = cfg.get("onboarding_done", False)
         token = cfg.get("token", "")
 
         if not onboarding_done:
-            self.mainStack.setCurrentIndex(0)
+            self.show_page("onboarding")
         elif token:
-            self.mainStack.setCurrentIndex(2)
+            self.show_dashboard()
         else:
-            self.mainStack.setCurrentIndex(1)
+            self.show_auth()
+
+    # Page modules are imported inside their factories so only the first page's
+    # widget/network import chain is loaded before the window appears.
+    def _make_onboarding(self):
+        from core.onboarding import OnboardingPage
+        return OnboardingPage(self.show_auth, self.config_manager)
+
+    def _make_auth(self):
+        from core.auth import AuthPage
+        return AuthPage(self.show_dashboard, self.config_manager)
 
-        self.apply_styles()
+    def _make_dashboard(self):
+        from core.dashboard import DashboardPage
+        return DashboardPage(self.config_manager)
+
+    def _make_backup(self):
+        from pushbox.core.files.backup import BackupPage
+        return BackupPage(self.config_manager)
+
+    def _make_restore(self):
+        from pushbox.core.files.restore import RestorePage
+        return RestorePage()
+
+    def _make_settings(self):
+        from core.settings import SettingsPage
+        return SettingsPage(self.config_manager)
+
+    def _ensure_page(self, name):
+        page = self._pages.get(name)
+        if page is None:
+            page = self._pages[name] = self._page_factories[name]()
+            self.mainStack.addWidget(page)
+        return page
+
+    def show_page(self, name):
+        self.mainStack.setCurrentWidget(self._ensure_page(name))
 
     def show_auth(self):
-        self.mainStack.setCurrentIndex(1)
+        self.show_page("auth")
 
     def show_dashboard(self):
-        self.mainStack.setCurrentIndex(2)
-
-    def apply_styles(self):
-        self.setStyleSheet(stylesheet)
+        self.show_page("dashboard")
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    # parsed once for the whole app instead of re-polished per window/page
+    app.setStyleSheet(stylesheet)
+    # process-wide like the stylesheet; this only sizes Qt's own pixmap cache for
+    # style and icon drawing, nothing in this tree inserts into it yet (KiB)
+    QPixmapCache.setCacheLimit(64 * 1024)
     window = MainWindow()
     window.resize(1000, 640)
     window.show()